@@ -18,6 +18,8 @@ from typing import (
     Optional,
 )
 
+import orjson
+
 from .commits import Commit
 from .diff import Diff
 from .environment import INSTALL_CERT_MSG, USER_AGENT
@@ -100,6 +102,9 @@ class ConduitAPI:
         if created:
             os.chmod(filename, 0o600)
 
+        # Replace any token `load_api_token` cached from the old file.
+        cache.set("api_token", token)
+
     def call(
         self, api_method: str, api_call_args: dict, *, api_token: Optional[str] = None
     ) -> dict:
@@ -124,7 +129,7 @@ class ConduitAPI:
         logger.debug("%s %s", req_args["url"], api_call_args)
 
         with url_request.urlopen(url_request.Request(**req_args)) as r:
-            res = json.load(r)
+            res = orjson.loads(r.read())
         if res["error_code"]:
             raise ConduitAPIError(res.get("error_info", "Error %s" % res["error_code"]))
         return res["result"]
@@ -256,9 +261,7 @@ class ConduitAPI:
             }
             found_phids = list(phids_by_id.values())
             query_field = "ids"
-            query_values = [
-                int(rev_id) for rev_id in set(ids) - set(phids_by_id.keys())
-            ]
+            query_values = {int(rev_id) for rev_id in ids if rev_id not in phids_by_id}
 
         else:
             phids_by_id = {}
@@ -323,13 +326,7 @@ class ConduitAPI:
             "attachments": {"commits": True},
         }
         response = self.call("differential.diff.search", api_call_args)
-        diff_list = response.get("data", [])
-
-        diff_dict = {}
-        for diff in diff_list:
-            diff_dict[diff["phid"]] = diff
-
-        return diff_dict
+        return {diff["phid"]: diff for diff in response.get("data", [])}
 
     def get_successor_phids(
         self, phid: str, include_abandoned: bool = False
@@ -351,17 +348,25 @@ class ConduitAPI:
         """Returns the list of PHIDs with direct dependency"""
         result = []
 
-        def _get_related(phid):
+        # The stack is linear, so each hop has exactly one source to query.
+        phid = base_phid
+        seen = {base_phid}
+        while True:
             api_call_args = {"sourcePHIDs": [phid], "types": ["revision.%s" % relation]}
             edge = self.call("edge.search", api_call_args)
-            if edge.get("data"):
-                if len(edge["data"]) > 1:
-                    raise NonLinearException()
+            if not edge.get("data"):
+                break
+
+            if len(edge["data"]) > 1:
+                raise NonLinearException()
 
-                result.append(edge["data"][0]["destinationPHID"])
-                _get_related(result[-1])
+            phid = edge["data"][0]["destinationPHID"]
+            if phid in seen:
+                # A cycle would otherwise be followed forever.
+                raise NonLinearException()
 
-        _get_related(base_phid)
+            seen.add(phid)
+            result.append(phid)
 
         if not result or include_abandoned:
             return result
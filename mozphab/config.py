@@ -61,6 +61,8 @@ class Config(object):
 
             [updater]
             self_last_check = 0
+            self_last_etag =
+            self_last_pypi_version =
             self_auto_update = True
             get_pre_releases = False
 
@@ -95,6 +97,10 @@ class Config(object):
         self.branch_name_template = self._config.get("patch", "branch_name_template")
         self.create_commit = self._getboolean("patch", "create_commit")
         self.self_last_check = self._getint("updater", "self_last_check")
+        self.self_last_etag = self._config.get("updater", "self_last_etag")
+        self.self_last_pypi_version = self._config.get(
+            "updater", "self_last_pypi_version"
+        )
         self.self_auto_update = self._getboolean("updater", "self_auto_update")
         self.get_pre_releases = self._getboolean("updater", "get_pre_releases")
         git_remote = self._config.get("git", "remote")
@@ -143,6 +149,11 @@ class Config(object):
             self._set("submit", "auto_submit", self.auto_submit)
             self._set("patch", "always_full_stack", self.always_full_stack)
             self._set("updater", "self_last_check", self.self_last_check)
+            # ETags may contain `%`, which `ConfigParser` would interpolate.
+            self._set(
+                "updater", "self_last_etag", self.self_last_etag.replace("%", "%%")
+            )
+            self._set("updater", "self_last_pypi_version", self.self_last_pypi_version)
             self._set("updater", "self_auto_update", self.self_auto_update)
             self._set("updater", "get_pre_releases", self.get_pre_releases)
             self._set("telemetry", "enabled", self.telemetry_enabled)
@@ -11,6 +11,11 @@ from typing import (
     Tuple,
 )
 
+GIT_HUNK_HEADER_RE = re.compile(
+    r"@@ -(?P<old_off>\d+)(?:,(?P<old_len>\d+))? "
+    r"\+(?P<new_off>\d+)(?:,(?P<new_len>\d+))? @@"
+)
+
 
 class Diff:
     """Representation of the Diff used to submit to the Phabricator."""
@@ -297,11 +302,7 @@ class Diff:
 
     @staticmethod
     def parse_git_diff(hdr: str) -> Tuple[int, int, int, int]:
-        m = re.match(
-            r"@@ -(?P<old_off>\d+)(?:,(?P<old_len>\d+))? "
-            r"\+(?P<new_off>\d+)(?:,(?P<new_len>\d+))? @@",
-            hdr,
-        )
+        m = GIT_HUNK_HEADER_RE.match(hdr)
         old_off = int(m.group("old_off"))
         old_len = int(m.group("old_len") or 1)
         new_off = int(m.group("new_off"))
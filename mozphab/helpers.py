@@ -27,13 +27,10 @@ from .commits import Commit
 from .logger import logger
 from .simplecache import cache
 
-# If a commit body matches **all** of these, reject it.  This is to avoid the
-# necessity to merge arc-style fields across an existing commit description
-# and what we need to set.
-ARC_REJECT_RE_LIST = [
-    re.compile(r"^Summary:", flags=re.MULTILINE),
-    re.compile(r"^Reviewers:", flags=re.MULTILINE),
-]
+# If a commit body has lines starting with **all** of these, reject it.  This is
+# to avoid the necessity to merge arc-style fields across an existing commit
+# description and what we need to set.
+ARC_REJECT_FIELDS = ("Summary:", "Reviewers:")
 
 
 ARC_DIFF_REV_RE = re.compile(
@@ -66,12 +63,18 @@ REQUEST_REVIEWERS_RE = re.compile(REVIEWERS_RE % r"[?]")
 GRANTED_REVIEWERS_RE = re.compile(REVIEWERS_RE % r"=")
 R_SPECIFIER_RE = re.compile(r"\br[=?]")
 BLOCKING_REVIEWERS_RE = re.compile(r"\b(r!)([" + IRC_NICK_CHARS_WITH_PERIOD + ",]+)")
+# Matches the "\0" markers left by `replace_reviewers`, with leading separators.
+LIST_MARKER_RE = re.compile(LIST + "\0")
 
 DEPENDS_ON_RE = re.compile(r"^\s*Depends on\s*D(\d+)\s*$", flags=re.MULTILINE)
 
 
 VALID_EMAIL_RE = re.compile(r"[^@ \t\r\n]+@[^@ \t\r\n]+\.[^@ \t\r\n]+")
 
+# POSIX and DOS line separators, captured to keep them when splitting.
+LINESEP_RE = re.compile("(\n|\r\n)")
+LINESEP_BYTES_RE = re.compile(b"(\n|\r\n)")
+
 
 def which_path(path: str) -> Optional[str]:
     """Check if an executable is provided. Fall back to which if not.
@@ -280,7 +283,9 @@ def prompt(question: str, options: Optional[List[str]] = None):
 
 
 def has_arc_rejections(body: str) -> bool:
-    return all(r.search(body) for r in ARC_REJECT_RE_LIST)
+    return all(
+        body.startswith(field) or f"\n{field}" in body for field in ARC_REJECT_FIELDS
+    )
 
 
 def augment_commits_from_body(commits: List[Commit]):
@@ -311,6 +316,11 @@ def augment_commits_from_body(commits: List[Commit]):
 
 
 def parse_bugs(title: str) -> List[str]:
+    # Most titles can't match `BUG_ID_RE`, skip the regex for those.
+    lower_title = title.lower()
+    if "bug" not in lower_title and "b=" not in lower_title:
+        return []
+
     return list(BUG_ID_RE.findall(title))
 
 
@@ -330,13 +340,18 @@ def parse_reviewers(title: str) -> dict:
         Returns:
             dict (str, list of str): a dictionary of requested and granted reviewers
         """
-        for match in re.finditer(match_re, title):
+        for match in match_re.finditer(title):
             if match.group(3):
-                matches.extend(re.split(LIST_RE, match.group(3)))
+                matches.extend(LIST_RE.split(match.group(3)))
 
+    # Each type is searched separately, since the reviewers of one type can end
+    # with the delimiter of the other type (e.g. "r?a.r=b").  Only search for
+    # the types present in the title.
     reviewers = {"request": [], "granted": []}
-    extend_matches(REQUEST_REVIEWERS_RE, reviewers["request"])
-    extend_matches(GRANTED_REVIEWERS_RE, reviewers["granted"])
+    if "r?" in title:
+        extend_matches(REQUEST_REVIEWERS_RE, reviewers["request"])
+    if "r=" in title:
+        extend_matches(GRANTED_REVIEWERS_RE, reviewers["granted"])
     return reviewers
 
 
@@ -404,13 +419,13 @@ def replace_reviewers(commit_description: str, reviewers: dict) -> str:
             else:
                 return matchobj.group(0)
 
-        commit_title = re.sub(ALL_REVIEWERS_RE, replace_first_reviewer, commit_title)
+        commit_title = ALL_REVIEWERS_RE.sub(replace_first_reviewer, commit_title)
 
         # remove marker values as well as leading separators.  this allows us
         # to remove runs of multiple reviewers and retain the trailing
         # separator.
-        commit_title = re.sub(LIST + "\0", "", commit_title)
-        commit_title = re.sub("\0", "", commit_title)
+        commit_title = LIST_MARKER_RE.sub("", commit_title)
+        commit_title = commit_title.replace("\0", "")
 
     if commit_description == "":
         return commit_title.strip()
@@ -523,12 +538,10 @@ def split_lines(body: bytes | str) -> List[bytes | str]:
         >>> split_lines(test)
         >>> ["line1", "\n", "line2", "\r\n", "line3"]
     """
-    binary = isinstance(body, bytes)
-    pattern = b"(\n|\r\n)"
-    if not binary:
-        pattern = pattern.decode("utf-8")
+    if isinstance(body, bytes):
+        return LINESEP_BYTES_RE.split(body)
 
-    return re.split(pattern, body)
+    return LINESEP_RE.split(body)
 
 
 def join_lineseps(lines: List[str]) -> List[str]:
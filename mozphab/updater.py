@@ -3,17 +3,19 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
+import gzip
 import json
 import os
 import sys
+import sysconfig
 import time
+import urllib.error
 import urllib.request
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 
+from packaging.specifiers import InvalidSpecifier, SpecifierSet
 from packaging.version import Version
-from pkg_resources import parse_version
-from setuptools import Distribution
 
 from mozphab import environment
 
@@ -26,23 +28,61 @@ from .subprocess_wrapper import check_call
 # Update every three days.
 SELF_UPDATE_FREQUENCY_SECONDS = 24 * 3 * 60 * 60
 
+# Timeout applied to each blocking socket operation (including connect) when
+# talking to PyPI. Kept short as the check runs before every command.
+PYPI_TIMEOUT_SECONDS = 5
 
-def get_pypi_json() -> dict:
-    """Get data about `MozPhab` from the JSON API endpoint."""
+# Version of the running Python, to compare against `requires_python`.
+PYTHON_VERSION = "{}.{}.{}".format(*sys.version_info[:3])
+
+
+def read_json_response(response) -> dict:
+    """Parse the JSON body of a PyPI response, decompressing it if needed."""
+    output = response.read()
+    if response.headers.get("Content-Encoding") == "gzip":
+        output = gzip.decompress(output)
+
+    # `json.loads` detects the encoding of `bytes` itself.
+    return json.loads(output)
+
+
+def get_pypi_json(etag: Optional[str] = None) -> Tuple[Optional[dict], Optional[str]]:
+    """Get data about `MozPhab` from the JSON API endpoint.
+
+    If `etag` is passed the request is made conditional. Return the parsed
+    response and its `ETag`, or `None` in place of the response if the data
+    is unchanged since `etag` was returned.
+    """
     url = "https://pypi.org/pypi/MozPhab/json"
-    output = urllib.request.urlopen(urllib.request.Request(url), timeout=30).read()
-    response = json.loads(output.decode("utf-8"))
-    return response
+    headers = {"Accept-Encoding": "gzip"}
+    if etag:
+        headers["If-None-Match"] = etag
+
+    try:
+        response = urllib.request.urlopen(
+            urllib.request.Request(url, headers=headers), timeout=PYPI_TIMEOUT_SECONDS
+        )
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None, etag
+        raise
+
+    with response:
+        return read_json_response(response), response.headers.get("ETag")
 
 
 def get_simple_json() -> dict:
     """Get data about `MozPhab` from the `simple` API endpoint."""
     url = "https://pypi.org/simple/MozPhab"
     request = urllib.request.Request(
-        url, headers={"Accept": "application/vnd.pypi.simple.v1+json"}
+        url,
+        headers={
+            "Accept": "application/vnd.pypi.simple.v1+json",
+            "Accept-Encoding": "gzip",
+        },
     )
-    output = urllib.request.urlopen(request, timeout=30).read()
-    return json.loads(output.decode("utf-8"))
+    with urllib.request.urlopen(request, timeout=PYPI_TIMEOUT_SECONDS) as response:
+        return read_json_response(response)
 
 
 def parse_latest_prerelease_version(simple_json: dict) -> str:
@@ -80,8 +120,8 @@ def should_self_update(self_last_check: int, current_time: int) -> bool:
     time_since_last_check = current_time - self_last_check
     if time_since_last_check <= SELF_UPDATE_FREQUENCY_SECONDS:
         logger.debug(
-            f"Time since last check is {round(time_since_last_check)} seconds, "
-            "skipping check for new versions."
+            "Time since last check is %d seconds, skipping check for new versions.",
+            time_since_last_check,
         )
         return False
 
@@ -95,7 +135,7 @@ def check_for_updates(force_check: bool = False) -> Optional[str]:
     found or return `None`. Use `force_check` to check for updates even when the
     usual conditions aren't met.
     """
-    logger.debug(f"Forced update check: {force_check}.")
+    logger.debug("Forced update check: %s.", force_check)
 
     # Return if our check conditions aren't met.
     current_time_s = int(time.time())
@@ -107,39 +147,61 @@ def check_for_updates(force_check: bool = False) -> Optional[str]:
 
     config.self_last_check = current_time_s
     current_version = MOZPHAB_VERSION
-    pypi_json = get_pypi_json()
-    pypi_info = pypi_json["info"]
-
-    if not config.get_pre_releases:
-        # Use the latest full release.
-        pypi_version = pypi_info["version"]
-    else:
-        # Find the latest pre-release version manually since the "version" key
-        # only contains the latest full release on PyPI.
-        simple_json = get_simple_json()
-        pypi_version = parse_latest_prerelease_version(simple_json)
 
-    logger.debug(f"Versions - local: {current_version}, PyPI: {pypi_version}")
+    # The cached version is only valid for full releases, since pre-releases are
+    # found using the `simple` API.
+    etag = None
+    if not config.get_pre_releases and config.self_last_pypi_version:
+        etag = config.self_last_etag
 
-    # convert ">=3.6" to (3, 6)
     try:
-        required_python_version = tuple(
-            [int(i) for i in pypi_info["requires_python"][2:].split(".")]
-        )
-    except ValueError:
-        required_python_version = ()
-
-    if sys.version_info < required_python_version:
-        raise Error(
-            "Unable to upgrade to version {}.\n"
-            "MozPhab requires Python in version {}".format(
-                pypi_version, pypi_info["requires_python"]
+        pypi_json, etag = get_pypi_json(etag)
+
+        if pypi_json is None:
+            # Nothing was released since the last check.
+            pypi_version = config.self_last_pypi_version
+        elif not config.get_pre_releases:
+            # Use the latest full release.
+            pypi_version = pypi_json["info"]["version"]
+        else:
+            # Find the latest pre-release version manually since the "version" key
+            # only contains the latest full release on PyPI.
+            simple_json = get_simple_json()
+            pypi_version = parse_latest_prerelease_version(simple_json)
+    except OSError as e:
+        # `URLError` and socket timeouts are both `OSError`s. Don't block the
+        # requested command on an unreachable PyPI unless the check was forced.
+        if force_check:
+            raise Error(f"Unable to check for updates: {e}")
+
+        logger.debug("PyPI is unreachable, skipping check for new versions: %s", e)
+        return
+
+    logger.debug("Versions - local: %s, PyPI: %s", current_version, pypi_version)
+
+    if pypi_json is not None:
+        requires_python = pypi_json["info"]["requires_python"]
+
+        try:
+            python_specifier = SpecifierSet(requires_python or "")
+        except InvalidSpecifier:
+            python_specifier = SpecifierSet()
+
+        if PYTHON_VERSION not in python_specifier:
+            raise Error(
+                "Unable to upgrade to version {}.\n"
+                "MozPhab requires Python in version {}".format(
+                    pypi_version, requires_python
+                )
             )
-        )
 
+    # Don't keep the `ETag` for pre-releases so switching back to full releases
+    # won't reuse a pre-release version.
+    config.self_last_etag = etag if etag and not config.get_pre_releases else ""
+    config.self_last_pypi_version = pypi_version
     config.write()
 
-    if parse_version(current_version) >= parse_version(pypi_version):
+    if Version(current_version) >= Version(pypi_version):
         logger.debug("update check not required")
         return
 
@@ -148,6 +210,18 @@ def check_for_updates(force_check: bool = False) -> Optional[str]:
     return pypi_version
 
 
+def get_user_scripts_dir() -> str:
+    """Return the directory scripts are installed to by `pip install --user`."""
+    if sys.version_info >= (3, 10):
+        scheme = sysconfig.get_preferred_scheme("user")
+    elif sys.platform == "darwin" and getattr(sys, "_framework", None):
+        scheme = "osx_framework_user"
+    else:
+        scheme = f"{os.name}_user"
+
+    return sysconfig.get_path("scripts", scheme)
+
+
 def self_upgrade():
     """Upgrade ourselves with pip."""
 
@@ -169,40 +243,32 @@ def self_upgrade():
 
     # `sys.argv[0]` is the path to the script that was used to start python.
     # For example: `/home/connor/.virtualenvs/moz-phab-dev/bin/moz-phab`. Run
-    # `.resolve()` to make sure we have a full path, and then the `parent` is
+    # `realpath` to make sure we have a full path, and then the `dirname` is
     # the directory for the script.
-    script_dir = Path(sys.argv[0]).resolve().parent
+    script_dir = os.path.dirname(os.path.realpath(sys.argv[0]))
 
     # If moz-phab was installed with --user, we need to pass it to pip
-    # Create "install" setuptools command with --user to find the scripts_path
-    d = Distribution()
-    d.parse_config_files()
-    i = d.get_command_obj("install", create=True)
-    # Forcing the environment detected by Distribution to the --user one
-    i.user = True
-    i.prefix = i.exec_prefix = i.home = i.install_base = i.install_platbase = None
-    i.finalize_options()
-    # Checking if the moz-phab script is installed in user's scripts directory
-    user_dir = Path(i.install_scripts).resolve()
+    user_dir = os.path.realpath(get_user_scripts_dir())
 
     # Prevent self-update from failing when installing over OS-managed
     # installs; see bug 1876182.
     command_env = os.environ.copy()
     command_env["PIP_BREAK_SYSTEM_PACKAGES"] = "1"
 
-    if script_dir == user_dir:
+    # Compare with `normcase` so case-insensitive paths on Windows still match.
+    if os.path.normcase(script_dir) == os.path.normcase(user_dir):
         command.append("--user")
 
     if environment.IS_WINDOWS:
         # Windows does not allow to remove the exe file of the running process.
         # Renaming the `moz-phab.exe` file to allow pip to install a new version.
-        temp_exe = script_dir / "moz-phab-temp.exe"
+        temp_exe = Path(script_dir) / "moz-phab-temp.exe"
         try:
             temp_exe.unlink()
         except FileNotFoundError:
             pass
 
-        exe = script_dir / "moz-phab.exe"
+        exe = Path(script_dir) / "moz-phab.exe"
         exe.rename(temp_exe)
 
         try:
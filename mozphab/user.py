@@ -2,12 +2,14 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 import hashlib
-import json
+import operator
 import time
 import uuid
 from pathlib import Path
 from typing import Optional
 
+import orjson
+
 from mozphab import environment
 
 from .bmo import bmo
@@ -16,11 +18,15 @@ from .logger import logger
 
 USER_INFO_FILE = Path(environment.MOZBUILD_PATH) / "user_info.json"
 EMPLOYEE_CHECK_FREQUENCY = 24 * 7 * 60 * 60  # week
-MOZILLA_EMPLOYEE_EMAIL_ENDINGS = {
+MOZILLA_EMPLOYEE_EMAIL_ENDINGS = (
     "@getpocket.com",
     "@mozilla.com",
     "@mozillafoundation.org",
-}
+)
+USER_DATA_KEYS = ("is_employee", "user_code", "installation_id", "last_check")
+
+# Fetch all of the `UserData` values in one call.
+_get_user_data_values = operator.attrgetter(*USER_DATA_KEYS)
 
 
 def is_bad_uuid(key: str, value: Optional[str]) -> bool:
@@ -46,22 +52,22 @@ def format_uuid(bad_uuid: str) -> str:
 
 
 class UserData:
-    is_employee = None
-    user_code = None
-    installation_id = None
-    last_check = None
-    keys = ["is_employee", "user_code", "installation_id", "last_check"]
+    __slots__ = USER_DATA_KEYS
+    keys = USER_DATA_KEYS
 
     def __init__(self):
+        for key in self.keys:
+            setattr(self, key, None)
+
         self.set_from_file()
 
     @property
     def is_data_collected(self) -> bool:
         """True if all user info data is collected."""
-        return all(getattr(self, k) is not None for k in self.keys)
+        return None not in _get_user_data_values(self)
 
     def to_dict(self) -> dict:
-        return {k: getattr(self, k) for k in self.keys}
+        return dict(zip(self.keys, _get_user_data_values(self)))
 
     def update_from_dict(self, dictionary: dict):
         """Assign attributes from a dict."""
@@ -78,16 +84,25 @@ class UserData:
         if not USER_INFO_FILE.exists():
             return
 
-        with USER_INFO_FILE.open("r", encoding="utf-8") as f:
-            user_info = json.load(f)
-            self.update_from_dict(user_info)
+        user_info = orjson.loads(USER_INFO_FILE.read_bytes())
+        self.update_from_dict(user_info)
 
     def save_user_info(self, **kwargs):
         """Save any fields provided as kwargs into the user_info file."""
         self.update_from_dict(kwargs)
+        self.write_user_info()
+
+    def write_user_info(self):
+        """Write the current user info into the user_info file."""
         user_info = self.to_dict()
-        with USER_INFO_FILE.open("w", encoding="utf-8") as f:
-            json.dump(user_info, f, sort_keys=True, indent=2)
+
+        # Write to a temporary file first so an interrupted write can't leave
+        # a corrupted file behind.
+        temp_file = USER_INFO_FILE.with_suffix(".json.tmp")
+        temp_file.write_bytes(
+            orjson.dumps(user_info, option=orjson.OPT_SORT_KEYS | orjson.OPT_INDENT_2)
+        )
+        temp_file.replace(USER_INFO_FILE)
 
     def whoami(self) -> Optional[dict]:
         """Returns a dict with email and employee status."""
@@ -110,9 +125,7 @@ class UserData:
             return response
 
         lower_email = response["email"].lower()
-        if any(
-            lower_email.endswith(domain) for domain in MOZILLA_EMPLOYEE_EMAIL_ENDINGS
-        ):
+        if lower_email.endswith(MOZILLA_EMPLOYEE_EMAIL_ENDINGS):
             response["is_employee"] = True
             return response
 
@@ -157,12 +170,7 @@ class UserData:
 
         self.last_check = int(time.time())
         self.is_employee = whoami["is_employee"]
-        self.save_user_info(
-            is_employee=self.is_employee,
-            user_code=self.user_code,
-            installation_id=self.installation_id,
-            last_check=self.last_check,
-        )
+        self.write_user_info()
         return is_employee != self.is_employee
 
 
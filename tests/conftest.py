@@ -1,7 +1,11 @@
 # This Source Code Form is subject to the terms of the Mozilla Public
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
+import contextlib
+import copy
+import functools
 import io
+import itertools
 import json
 import os
 import re
@@ -14,6 +18,7 @@ import uuid
 from pathlib import Path
 from unittest import mock
 
+import hglib
 import pytest
 from glean import testing
 
@@ -38,15 +43,31 @@ from mozphab.mercurial import Mercurial  # noqa: E402
 environment.SHOW_SPINNER = False
 environment.HTTP_ALLOWED = True
 
+# Contents of the `.arcconfig` file of the test repositories.
+ARCCONFIG = json.dumps({"phabricator.uri": "http://example.test"})
+
+
+class TempFileStub:
+    """Context manager entered as each of `filenames` in turn.
+
+    A single filename is returned every time the context is entered.
+    """
+
+    def __init__(self, filenames):
+        if len(filenames) > 1:
+            self._filenames = iter(filenames)
+        else:
+            self._filenames = itertools.repeat(filenames[0])
+
+    def __enter__(self):
+        return next(self._filenames)
+
+    def __exit__(self, *exc_info):
+        return None
+
 
 def create_temp_fn(*filenames):
-    m_temp_fn = mock.Mock()
-    if len(filenames) > 1:
-        m_temp_fn.__enter__ = mock.Mock(side_effect=filenames)
-    else:
-        m_temp_fn.__enter__ = mock.Mock(return_value=filenames[0])
-    m_temp_fn.__exit__ = mock.Mock(return_value=None)
-    return m_temp_fn
+    return TempFileStub(filenames)
 
 
 def search_diff(diff=1, phid="PHID-DIFF-1", node="aaa000aaa000"):
@@ -123,8 +144,8 @@ def init_sha(in_process, git_repo_path, git_sha):
     return git_sha()
 
 
-@pytest.fixture(autouse=True)
-def reset_cache():
+def pytest_runtest_setup(item):
+    # Start every test with an empty cache.
     simplecache.cache.reset()
 
 
@@ -141,71 +162,109 @@ def data_file():
 
 
 @pytest.fixture
-def git_command():
-    mozphab.config.git_command = ["git"]
+def git_command(monkeypatch):
+    monkeypatch.setattr(mozphab.config, "git_command", ["git"])
     return mozphab.config
 
 
-@pytest.fixture
-@mock.patch("mozphab.gitcommand.GitCommand.output")
-@mock.patch("mozphab.git.Git._get_current_head")
-@mock.patch("mozphab.repository.os.path")
-@mock.patch("mozphab.helpers.which")
-@mock.patch("mozphab.repository.read_json_field")
-def git(
-    m_read_json_field,
-    m_which,
-    m_os_path,
-    m_git_get_current_head,
-    m_git_git_out,
-    repo_phab_url,
-    git_command,
-):
-    m_read_json_field.return_value = "TEST"
-    m_os_path.join = os.path.join
-    m_os_path.exists.return_value = True
-    m_which.return_value = True
-    m_os_path.isfile.return_value = False
-    m_git_git_out.side_effect = ("git version 2.25.0",)
-    m_git_get_current_head.return_value = "branch"
-    git = Git("x")
+# Patches applied while constructing the `git` and `hg` repository templates, as
+# `(target, attributes of the mock)` pairs.
+REPOSITORY_INIT_PATCHES = (
+    ("mozphab.repository.Repository._phab_url", {"return_value": "http://phab.test"}),
+    ("mozphab.repository.read_json_field", {"return_value": "TEST"}),
+    ("mozphab.helpers.which", {"return_value": True}),
+    (
+        "mozphab.repository.os.path",
+        {
+            "join": os.path.join,
+            "exists.return_value": True,
+            "isfile.return_value": False,
+        },
+    ),
+)
+GIT_INIT_PATCHES = REPOSITORY_INIT_PATCHES + (
+    ("mozphab.gitcommand.GitCommand.output", {"side_effect": ("git version 2.25.0",)}),
+    ("mozphab.git.Git._get_current_head", {"return_value": "branch"}),
+)
+HG_INIT_PATCHES = REPOSITORY_INIT_PATCHES + (
+    ("mozphab.mercurial.hglib.open", {}),
+    ("mozphab.mercurial.Mercurial.repository", {"version": (4, 7, 1, "bleh")}),
+    ("mozphab.repository.os.chdir", {"return_value": True}),
+)
+
+
+def enter_patches(stack, patches):
+    """Enter a `mock.patch` for each of the `(target, attributes)` in `patches`."""
+    for target, attributes in patches:
+        stack.enter_context(mock.patch(target, **attributes))
+
+
+@pytest.fixture(scope="session")
+def git_template():
+    """Build the repository of the `git` fixture once per session."""
+    with contextlib.ExitStack() as stack:
+        mp = stack.enter_context(pytest.MonkeyPatch.context())
+        mp.setattr(mozphab.config, "git_command", ["git"])
+        enter_patches(stack, GIT_INIT_PATCHES)
+        git = Git("x")
     git._phab_vcs = "git"
     return git
 
 
 @pytest.fixture
-@mock.patch("mozphab.repository.os.chdir")
-@mock.patch("mozphab.mercurial.Mercurial.repository")
-@mock.patch("mozphab.repository.os.path")
-@mock.patch("mozphab.helpers.which")
-@mock.patch("mozphab.repository.read_json_field")
-@mock.patch("mozphab.mercurial.hglib.open")
-def hg(
-    m_hglib_open,
-    m_read_json_field,
-    m_which,
-    m_os_path,
-    m_repository,
-    m_os_chdir,
-    safe_environ,
-    repo_phab_url,
-):
-    m_read_json_field.return_value = "TEST"
-    m_os_path.join = os.path.join
-    m_os_path.exists.return_value = True
-    m_which.return_value = True
-    m_os_path.isfile.return_value = False
-    m_repository.version = 4, 7, 1, "bleh"
-    m_os_chdir.return_value = True
-    mozphab.config.hg_command = ["hg"]
-    hg = Mercurial("x")
+def git(repo_phab_url, git_command, git_template):
+    # The repository only holds plain data, so a copy is independent of the
+    # template and much faster than constructing a new one.
+    git = copy.deepcopy(git_template)
+    # The template captured the environment before any test set up its own,
+    # e.g. the $HOME of `fresh_global_config`.
+    git.git._env = os.environ.copy()
+    return git
+
+
+@pytest.fixture(scope="session")
+def hg_template():
+    """Build the repository of the `hg` fixture once per session."""
+    with contextlib.ExitStack() as stack:
+        mp = stack.enter_context(pytest.MonkeyPatch.context())
+        mp.setattr(mozphab.config, "hg_command", ["hg"])
+        enter_patches(stack, HG_INIT_PATCHES)
+        hg = Mercurial("x")
     hg.use_evolve = True
     hg.has_mq = False
     hg._phab_vcs = "hg"
     return hg
 
 
-def hg_out(*args):
+@pytest.fixture
+def hg(monkeypatch, safe_environ, repo_phab_url, hg_template):
+    monkeypatch.setattr(mozphab.config, "hg_command", ["hg"])
+    return copy.deepcopy(hg_template)
+
+
+# Command server clients of the `hg_repo_path` repositories, by path. Clients
+# are only started by the first `hg_out` call in the repository.
+hg_clients = {}
+
+
+def hg_out(*args, client=None):
+    """Run a `hg` command and return its output.
+
+    Commands are run in-process through `client` if a `hglib` client is passed,
+    or through the client of the `hg_repo_path` repository in the current
+    directory, avoiding the startup cost of a new `hg` process.
+    """
+    cwd = os.getcwd()
+    if client is None and cwd in hg_clients:
+        client = hg_clients[cwd]
+        if client is None:
+            client = hg_clients[cwd] = hglib.open(cwd, encoding="UTF-8")
+
+    if client is not None:
+        return client.rawcommand([str(arg).encode("utf-8") for arg in args]).decode(
+            "utf-8"
+        )
+
     args = ["hg"] + list(args)
     return subprocess.check_output(args, universal_newlines=True, encoding="utf-8")
 
@@ -216,6 +275,7 @@ def write_text(filename, content, **kwargs):
         f.write(content)
 
 
+@functools.lru_cache(maxsize=None)
 def find_script_path(name):
     """Return the fully qualified path to an executable, preferring those installed
     into the current virtualenv."""
@@ -231,88 +291,142 @@ def find_script_path(name):
     raise Exception("Failed to find script: %s" % filename)
 
 
-@pytest.fixture
-def hg_repo_path(monkeypatch, tmp_path):
-    """Build a usable HG repository. Return the pathlib.Path to the repo."""
-    phabricator_uri = "http://example.test"
-    repo_path = tmp_path / "hg-repo"
+def write_global_config(path):
+    """Write the `.gitconfig` and `.hgrc` files used as global config in tests."""
+    with open("{}/.gitconfig".format(path), "w") as f:
+        f.write("[user]\n\tname = Developer\n\temail = developer@mozilla.com\n")
+    with open("{}/.hgrc".format(path), "w") as f:
+        f.write(
+            "[ui]\nusername = Developer <developer@mozilla.com>\n"
+            "[extensions]\nevolve =\n"
+        )
+
+
+def use_global_config(monkeypatch, path):
+    """Use the global config written in `path` with `write_global_config`."""
+    # Git has to find its global config through $HOME, which the git safe mode
+    # clears to ignore the user's config.
+    monkeypatch.setenv("HOME", str(path))
+    monkeypatch.setenv("HGRCPATH", str(path / ".hgrc"))
+
+
+@pytest.fixture(scope="session")
+def global_config_home(tmp_path_factory):
+    """Build a $HOME with the global config, shared by the whole session."""
+    home = tmp_path_factory.mktemp("home")
+    write_global_config(home)
+    return home
+
+
+@pytest.fixture(scope="session")
+def hg_repo_template(tmp_path_factory, global_config_home):
+    """Build a HG repository once per session, to be copied by `hg_repo_path`."""
+    repo_path = tmp_path_factory.mktemp("hg-template") / "hg-repo"
     repo_path.mkdir()
-    monkeypatch.chdir(str(repo_path))
-    arcconfig = repo_path / ".arcconfig"
-    arcconfig.write_text(json.dumps({"phabricator.uri": phabricator_uri}))
-    hg_out("init")
-    hg_out("add")
-    hg_out("commit", "-m", "init")
+    (repo_path / ".arcconfig").write_text(ARCCONFIG)
+    with pytest.MonkeyPatch.context() as mp:
+        use_global_config(mp, global_config_home)
+        with hglib.init(str(repo_path), encoding="UTF-8") as client:
+            hg_out("add", client=client)
+            hg_out("commit", "-m", "init", client=client)
     # graphshorten changes `log --graph` output, force to false
-    with open(".hg/hgrc", "a") as f:
+    with open(repo_path / ".hg" / "hgrc", "a") as f:
         f.write("\n[experimental]\ngraphshorten = false\n")
     return repo_path
 
 
 @pytest.fixture
-def fresh_global_config(tmp_path):
+def hg_repo_path(monkeypatch, tmp_path, hg_repo_template):
+    """Build a usable HG repository. Return the pathlib.Path to the repo."""
+    repo_path = tmp_path / "hg-repo"
+    shutil.copytree(hg_repo_template, repo_path, symlinks=True)
+    monkeypatch.chdir(str(repo_path))
+    cwd = os.getcwd()
+    hg_clients[cwd] = None
+    yield repo_path
+    client = hg_clients.pop(cwd)
+    if client is not None:
+        client.close()
+
+
+@pytest.fixture
+def fresh_global_config(monkeypatch, global_config_home):
     """Overrides global ~/.gitconfig.
 
-    Creates a tiny gitconfig file in the temp repo and sets it as the $HOME
+    Uses the tiny gitconfig file written once per session and sets its directory
+    as the $HOME
     """
-    original_env = os.environ.copy()
-    env = os.environ
-    env["HOME"] = str(tmp_path)
-    with open("{}/.gitconfig".format(tmp_path), "w") as f:
-        f.write("[user]\n\tname = Developer\n\temail = developer@mozilla.com\n")
-    with open("{}/.hgrc".format(tmp_path), "w") as f:
-        f.write(
-            "[ui]\nusername = Developer <developer@mozilla.com>\n"
-            "[extensions]\nevolve =\n"
-        )
-    yield
-    os.environ.clear()
-    os.environ.update(original_env)
+    use_global_config(monkeypatch, global_config_home)
 
 
 def git_out(*args):
     env = os.environ.copy()
-    args = [
-        "git",
-        "-c",
-        "i18n.logOutputEncoding=UTF-8",
-        "-c",
-        "i18n.commitEncoding=UTF-8",
-    ] + list(args)
+    args = ["git"] + list(args)
     env["DEBUG"] = "1"
     return subprocess.check_output(
         args, env=env, universal_newlines=True, encoding="utf-8"
     )
 
 
+@pytest.fixture(scope="session")
+def git_repo_template(tmp_path_factory, global_config_home):
+    """Build a Git repository once per session, to be copied by `git_repo_path`."""
+    repo_path = tmp_path_factory.mktemp("git-template") / "git-repo"
+    repo_path.mkdir()
+    (repo_path / ".arcconfig").write_text(ARCCONFIG)
+
+    with pytest.MonkeyPatch.context() as mp:
+        use_global_config(mp, global_config_home)
+        mp.chdir(repo_path)
+
+        # Skip the sample hooks of the default template, leaving fewer files to
+        # copy into each test's repository.
+        init_args = ["init", "--template="]
+        # Use --initial-branch where available to avoid an unnecessary warning
+        m = re.search(r"(\d+\.\d+)\.\d+", git_out("version"))
+        if m and float(m[1]) >= 2.28:
+            init_args += ["--initial-branch", "main"]
+        git_out(*init_args)
+        # Stored in the repository config, so every copy of the template has it.
+        git_out("config", "i18n.logOutputEncoding", "UTF-8")
+        git_out("config", "i18n.commitEncoding", "UTF-8")
+
+        git_out("add", ".")
+        git_out("commit", "--message", "initial commit")
+    return repo_path
+
+
 @pytest.fixture
-def git_repo_path(monkeypatch, tmp_path):
+def git_repo_path(monkeypatch, tmp_path, git_repo_template):
     """Build a usable Git repository. Return the pathlib.Path to the repo."""
-    phabricator_uri = "http://example.test"
     repo_path = tmp_path / "git-repo"
-    repo_path.mkdir()
+    shutil.copytree(git_repo_template, repo_path, symlinks=True)
     monkeypatch.chdir(str(repo_path))
-    arcconfig = repo_path / ".arcconfig"
-    arcconfig.write_text(json.dumps({"phabricator.uri": phabricator_uri}))
-
-    # Use --initial-branch where available to avoid an unnecessary warning
-    m = re.search(r"(\d+\.\d+)\.\d+", git_out("version"))
-    if m and float(m[1]) >= 2.28:
-        git_out("init", "--initial-branch", "main")
-    else:
-        git_out("init")
-
-    git_out("add", ".")
-    git_out("commit", "--message", "initial commit")
     return repo_path
 
 
+@pytest.fixture(scope="session", autouse=True)
+def static_mocks():
+    """Patch the functions no test should run, once for the whole session."""
+    with pytest.MonkeyPatch.context() as mp:
+        # Disable logging to keep the testrunner output clean
+        mp.setattr(mozphab, "init_logging", mock.MagicMock())
+        # Disable update checking.  It modifies the program on disk which we do
+        # /not/ want to do during a test run.
+        mp.setattr(mozphab, "check_for_updates", mock.Mock(return_value=None))
+        yield
+
+
 @pytest.fixture
 def safe_environ(monkeypatch):
-    # Make sure we preserve the system defaults.
-    monkeypatch.setattr(os, "environ", os.environ.copy())
-    # Disable logging to keep the testrunner output clean
-    monkeypatch.setattr(mozphab, "init_logging", mock.MagicMock())
+    # Make sure we preserve the system defaults. `moz-phab` only sets these
+    # variables, so let `monkeypatch` restore them rather than copying the
+    # whole environment.
+    for name in ("MOZPHAB", "HGRCPATH"):
+        if name in os.environ:
+            monkeypatch.setenv(name, os.environ[name])
+        else:
+            monkeypatch.delenv(name, raising=False)
 
 
 @pytest.fixture
@@ -322,8 +436,46 @@ def config():
         return config_module.Config(filename=Path(temp.name))
 
 
+@pytest.fixture(scope="session")
+def user_data_template():
+    """Build the user data used by `in_process` once per session."""
+    with pytest.MonkeyPatch.context() as mp:
+        m_user_info_file = mock.Mock()
+        m_user_info_file.exists.return_value = False
+        mp.setattr(user, "USER_INFO_FILE", m_user_info_file)
+        user_data = user.UserData()
+    user_data.update_from_dict(
+        {
+            "user_code": str(uuid.uuid4()),
+            "is_employee": True,
+            "installation_id": str(uuid.uuid4()),
+            "last_check": time.time(),
+        }
+    )
+    return user_data
+
+
+def reraise(*args, **kwargs):
+    raise
+
+
+def call_conduit_static(self, *args):
+    # Return alice as the only valid reviewer name from Phabricator.
+    # See https://phabricator.services.mozilla.com/api/user.search
+    return [{"userName": "alice"}]
+
+
+def read_json_field_local(self, *args):
+    if args[0][0] == "phabricator.uri":
+        return "http://example.test"
+    elif args[0][0] == "repository.callsign":
+        return "TEST"
+
+
 @pytest.fixture
-def in_process(monkeypatch, safe_environ, request, config):
+def in_process(
+    monkeypatch, safe_environ, mock_load_api_token, request, config, user_data_template
+):
     """Set up an environment to run moz-phab within the current process."""
     monkeypatch.setattr("mozphab.config.config", config)
     monkeypatch.setattr("mozphab.git.config", config)
@@ -332,16 +484,9 @@ def in_process(monkeypatch, safe_environ, request, config):
     # global variables :/
     monkeypatch.setattr(environment, "DEBUG", True)
     monkeypatch.setattr(environment, "HAS_ANSI", False)
-    # Constructing the Mercurial() object modifies os.environ for all tests.
-    # Disable update checking.  It modifies the program on disk which we do /not/ want
-    # to do during a test run.
-    monkeypatch.setattr(mozphab, "check_for_updates", mock.Mock(return_value=None))
 
     # Disable calls to sys.exit() at the end of the script.  Re-raise errors instead
     # to make test debugging easier.
-    def reraise(*args, **kwargs):
-        raise
-
     monkeypatch.setattr(sys, "exit", reraise)
 
     # Disable uploading a new commit title and summary to Phabricator.  This operation
@@ -349,36 +494,15 @@ def in_process(monkeypatch, safe_environ, request, config):
     monkeypatch.setattr(submit, "update_revision_description", mock.MagicMock())
 
     # Modify user_data object to not touch the file
-    user.USER_INFO_FILE = mock.Mock()
-    user.USER_INFO_FILE.exists.return_value = False
-    user.user_data = user.UserData()
-    user.user_data.update_from_dict(
-        {
-            "user_code": str(uuid.uuid4()),
-            "is_employee": True,
-            "installation_id": str(uuid.uuid4()),
-            "last_check": time.time(),
-        }
-    )
-
-    # Allow to define the check_call_by_line function in the testing module
-    def check_call_by_line_static(*args, **kwargs):
-        return ["Revision URI: http://example.test/D123"]
-
-    def call_conduit_static(self, *args):
-        # Return alice as the only valid reviewer name from Phabricator.
-        # See https://phabricator.services.mozilla.com/api/user.search
-        return [{"userName": "alice"}]
+    m_user_info_file = mock.Mock()
+    m_user_info_file.exists.return_value = False
+    monkeypatch.setattr(user, "USER_INFO_FILE", m_user_info_file)
+    monkeypatch.setattr(user, "user_data", copy.copy(user_data_template))
 
+    # Allow to define the call_conduit function in the testing module
     call_conduit = getattr(request.module, "call_conduit", call_conduit_static)
     monkeypatch.setattr(conduit.ConduitAPI, "call", call_conduit)
 
-    def read_json_field_local(self, *args):
-        if args[0][0] == "phabricator.uri":
-            return "http://example.test"
-        elif args[0][0] == "repository.callsign":
-            return "TEST"
-
     read_json_field = getattr(request.module, "read_json_field", read_json_field_local)
     monkeypatch.setattr(repository, "read_json_field", read_json_field)
 
@@ -390,12 +514,17 @@ def user_data(m_file):
     return user.UserData()
 
 
-@pytest.fixture(name="reset_glean", scope="function", autouse=True)
+@pytest.fixture(name="reset_glean", scope="function")
 def fixture_reset_glean():
+    """Reset Glean, for the tests using the Glean SDK."""
     testing.reset_glean(application_id="mozphab", application_version="0.1.86")
 
 
-@pytest.fixture(autouse=True)
+@pytest.fixture
 def mock_load_api_token(monkeypatch, request):
+    """Don't read the API token, for the tests running moz-phab with `in_process`.
+
+    Mark a test with `no_mock_token` to keep the real `load_api_token`.
+    """
     if "no_mock_token" not in request.keywords:
         monkeypatch.setattr("mozphab.conduit.ConduitAPI.load_api_token", mock.MagicMock)
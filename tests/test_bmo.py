@@ -74,8 +74,9 @@ def test_get(m_conduit, m_urlopen):
     assert bmo_error.value.args[0].startswith("Bugzilla Error: ")
 
 
+@mock.patch("mozphab.bmo.time.sleep")
 @mock.patch("mozphab.bmo.BMOAPI.get")
-def test_req_with_retries(m_get):
+def test_req_with_retries(m_get, m_sleep):
     # raises Error after 3 retries
     m_get.side_effect = (BMOAPIError, BMOAPIError, BMOAPIError)
     with pytest.raises(Error):
@@ -4,20 +4,21 @@
 
 import unittest
 
+import pytest
+
 from mozphab import helpers
 from mozphab.commands import submit
 from mozphab.commits import Commit
 
 
 class CommitParsing(unittest.TestCase):
-    def assertParsed(self, result, parsed):
-        self.assertEqual({"request": result[0], "granted": result[1]}, parsed)
-
     def test_bug_id(self):
         parse = helpers.parse_bugs
 
         self.assertEqual(parse("bug 1"), ["1"])
         self.assertEqual(parse("bug 123456"), ["123456"])
+        self.assertEqual(parse("b=1234"), ["1234"])
+        self.assertEqual(parse("B=1234"), ["1234"])
         self.assertEqual(parse("testb=1234x"), [])
         self.assertEqual(parse("ab4665521e2f"), [])
         self.assertEqual(parse("Aug 2008"), [])
@@ -27,179 +28,6 @@ class CommitParsing(unittest.TestCase):
         self.assertEqual(parse("bug 1 and bug 2"), ["1", "2"])
         self.assertEqual(parse("BUG 1 helper_bug2.html"), ["1", "2"])
 
-    def test_reviewers(self):
-        parse = helpers.parse_reviewers
-
-        # first with r? reviewer request syntax
-        self.assertParsed((["romulus"], []), parse("stuff; r?romulus"))
-        self.assertParsed((["#romulus"], []), parse("stuff; r?#romulus"))
-        self.assertParsed((["rom"], []), parse("stuff; r?rom#ulus"))
-        self.assertParsed(
-            (["romulus", "remus"], []), parse("stuff; r?romulus, r?remus")
-        )
-        self.assertParsed((["romulus", "remus"], []), parse("stuff; r?romulus,r?remus"))
-        self.assertParsed((["romulus", "remus"], []), parse("stuff; r?romulus, remus"))
-        self.assertParsed((["romulus", "remus"], []), parse("stuff; r?romulus,remus"))
-        self.assertParsed((["romulus"], []), parse("stuff; (r?romulus)"))
-        self.assertParsed((["romulus", "remus"], []), parse("stuff; (r?romulus,remus)"))
-        self.assertParsed((["romulus"], []), parse("stuff; [r?romulus]"))
-        self.assertParsed(
-            (["remus", "romulus"], []), parse(" stuff; [r?remus, r?romulus]")
-        )
-        self.assertParsed((["romulus"], []), parse("stuff; r?romulus, a=test-only"))
-        self.assertParsed((["romulus"], []), parse("stuff; r?romulus, ux-r=test-only"))
-
-        # now with r= mozphab granted syntax
-        self.assertParsed(([], ["romulus"]), parse("stuff; r=romulus"))
-        self.assertParsed(([], ["#romulus"]), parse("stuff; r=#romulus"))
-        self.assertParsed(([], ["rom"]), parse("stuff; r=rom#ulus"))
-        self.assertParsed(
-            ([], ["romulus", "remus"]), parse("stuff; r=romulus, r=remus")
-        )
-        self.assertParsed(([], ["romulus", "remus"]), parse("stuff; r=romulus,r=remus"))
-        self.assertParsed(([], ["romulus", "remus"]), parse("stuff; r=romulus, remus"))
-        self.assertParsed(([], ["romulus", "remus"]), parse("stuff; r=romulus,remus"))
-        self.assertParsed(([], ["romulus"]), parse("stuff; (r=romulus)"))
-        self.assertParsed(([], ["romulus", "remus"]), parse("stuff; (r=romulus,remus)"))
-        self.assertParsed(([], ["romulus"]), parse("stuff; [r=romulus]"))
-        self.assertParsed(
-            ([], ["remus", "romulus"]), parse("stuff; [r=remus, r=romulus]")
-        )
-        self.assertParsed(([], ["romulus"]), parse("stuff; r=romulus, a=test-only"))
-        self.assertParsed(([], ["romulus"]), parse("stuff; r=romulus, a?test-only"))
-        self.assertParsed(([], ["romulus"]), parse("stuff; r=romulus, ux-r=test-only"))
-
-        # mixed r? and r=
-        self.assertParsed((["romulus"], ["remus"]), parse("stuff; r?romulus r=remus"))
-        self.assertParsed((["remus"], ["romulus"]), parse("stuff; r=romulus r?remus"))
-        self.assertParsed(
-            (["romulus", "gps"], ["remus"]), parse("stuff; r?romulus,gps r=remus")
-        )
-        self.assertParsed(
-            (["romulus"], ["remus", "gps"]), parse("stuff; r?romulus r=remus,gps")
-        )
-        self.assertParsed(
-            (["romulus", "next"], ["remus", "gps"]),
-            parse("stuff; r?romulus r=remus r?next r=gps"),
-        )
-        self.assertParsed(
-            (["romulus", "romulus!", "romulus"], ["romulus", "romulus!", "romulus"]),
-            parse("stuff; r?romulus r=romulus r?romulus! r=romulus!,romulus r?romulus"),
-        )
-        self.assertParsed(
-            (["remus", "gps"], ["romulus"]), parse("stuff; r=romulus r?remus,gps")
-        )
-        self.assertParsed(
-            (["remus"], ["romulus", "gps"]), parse("stuff; r=romulus,gps r?remus")
-        )
-
-        # try some other separators than ;
-        self.assertParsed(([], ["romulus"]), parse("stuff r=romulus"))
-        self.assertParsed(
-            ([], ["romulus", "remus"]), parse("stuff. r=romulus, r=remus")
-        )
-        self.assertParsed(
-            ([], ["romulus", "remus"]), parse("stuff - r=romulus,r=remus")
-        )
-        self.assertParsed(([], ["romulus", "remus"]), parse("stuff, r=romulus, remus"))
-        self.assertParsed(([], ["romulus", "remus"]), parse("stuff.. r=romulus,remus"))
-        self.assertParsed(([], ["romulus"]), parse("stuff | (r=romulus)"))
-
-        # make sure things work with different spacing
-        self.assertParsed(([], ["romulus", "remus"]), parse("stuff;r=romulus,r=remus"))
-        self.assertParsed(([], ["romulus", "remus"]), parse("stuff.r=romulus, r=remus"))
-        self.assertParsed(([], ["romulus", "remus"]), parse("stuff,r=romulus, remus"))
-        self.assertParsed(([], ["gps"]), parse("stuff; r=gps DONTBUILD (NPOTB)"))
-        self.assertParsed(([], ["gps"]), parse("stuff; r=gps DONTBUILD"))
-        self.assertParsed(([], ["gps"]), parse("stuff; r=gps (DONTBUILD)"))
-
-        # make sure things work with a period in the nickname
-        self.assertParsed(
-            ([], ["jimmy.james", "bill.mcneal"]),
-            parse("stuff;r=jimmy.james,r=bill.mcneal"),
-        )
-
-        # make sure period at the end does not get included
-        self.assertParsed(([], ["jimmy"]), parse("stuff;r=jimmy."))
-
-        # check some funky names too
-        self.assertParsed(([], ["a"]), parse("stuff;r=a"))
-        self.assertParsed(([], ["aa"]), parse("stuff;r=aa"))
-        self.assertParsed(([], [".a"]), parse("stuff;r=.a"))
-        self.assertParsed(([], ["..a"]), parse("stuff;r=..a"))
-        self.assertParsed(([], ["...a"]), parse("stuff;r=...a"))
-        self.assertParsed(([], ["a...a"]), parse("stuff;r=a...a"))
-        self.assertParsed(([], ["a.b"]), parse("stuff;r=a.b"))
-        self.assertParsed(([], ["a.b.c"]), parse("stuff;r=a.b.c"))
-        self.assertParsed(([], ["-.-.-"]), parse("stuff;r=-.-.-"))
-
-        # altogether now with some spaces sprinkled here and there
-        self.assertParsed(
-            (
-                [],
-                [
-                    "a",
-                    "aa",
-                    ".a",
-                    "..a",
-                    "...a",
-                    "a...a",
-                    "a.b",
-                    "a.b.c",
-                    "-.-.-",
-                ],
-            ),
-            parse("stuff;r=a,aa,.a,..a,...a, a...a,a.b, a.b.c, -.-.-"),
-        )
-
-        # bare r?
-        self.assertParsed(([], []), parse("stuff; r?"))
-        self.assertParsed(([], []), parse("stuff, r="))
-
-        # oddball real-world examples
-        self.assertParsed(
-            ([], ["roc", "ehsan"]),
-            parse(
-                "Bug 1094764 - Implement AudioContext.suspend and friends.  r=roc,ehsan"
-            ),
-        )
-        self.assertParsed(
-            ([], ["bsmedberg", "dbaron"]),
-            parse(
-                "Bug 380783 - nsStringAPI.h: no equivalent of IsVoid (tell if "
-                "string is null), patch by Mook <mook.moz+mozbz@gmail.com>, "
-                "r=bsmedberg/dbaron, sr=dbaron, a1.9=bz"
-            ),
-        )
-        self.assertParsed(
-            ([], ["hsinyi"]),
-            parse(
-                "Bug 1181382: move declaration into namespace to resolve conflict. "
-                "r=hsinyi. try: -b d -p all -u none -t none"
-            ),
-        )
-        self.assertParsed(
-            ([], ["bsmedberg"]),
-            parse(
-                "Bug 1024110 - Change Aurora's default profile behavior to use "
-                "channel-specific profiles. r=bsmedberg f=gavin,markh"
-            ),
-        )
-        self.assertParsed(
-            ([], ["gijs"]),
-            parse(
-                "Bug 1199050 - Round off the corners of browser-extension-panel's "
-                "content. ui-r=maritz, r=gijs"
-            ),
-        )
-        self.assertParsed(
-            ([], ["billm"]),
-            parse(
-                "Bug 1197422 - Part 2: [webext] Implement the pageAction API. "
-                "r=billm ui-r=bwinton"
-            ),
-        )
-
     def test_morph_blocking_reviewers(self):
         def morph(title):
             commits = [Commit(title=title)]
@@ -249,6 +77,7 @@ class CommitParsing(unittest.TestCase):
         self.assertTrue(reject("Summary:\n\nReviewers:\n\n"))
         self.assertFalse(reject("Summary: blah"))
         self.assertFalse(reject("Reviewers: blah"))
+        self.assertFalse(reject("blah Summary: blah Reviewers: blah"))
 
     def test_commit_title_is_wip(self):
         self.assertFalse(Commit(title="blah").wip_in_commit_title())
@@ -258,11 +87,149 @@ class CommitParsing(unittest.TestCase):
         self.assertTrue(Commit(title="wip: blah").wip_in_commit_title())
         self.assertTrue(Commit(title="wip blah").wip_in_commit_title())
         self.assertTrue(Commit(title="wip").wip_in_commit_title())
+        self.assertTrue(Commit(title="WIP\n").wip_in_commit_title())
+        self.assertFalse(Commit(title="WIP\n\n").wip_in_commit_title())
+        # Titles `revision_title` strips the prefix from must be flagged as WIP.
+        self.assertTrue(Commit(title="WıP: blah").wip_in_commit_title())
+        self.assertTrue(Commit(title="wİp blah").wip_in_commit_title())
         self.assertFalse(Commit(title="WIPblah").wip_in_commit_title())
         self.assertFalse(Commit(title=" WIP: blah").wip_in_commit_title())
         self.assertFalse(Commit(title=" WIP blah").wip_in_commit_title())
         self.assertFalse(Commit(title=" WIP").wip_in_commit_title())
 
 
+# Commit titles and the `(request, granted)` reviewers parsed from them.
+REVIEWER_CASES = [
+    # first with r? reviewer request syntax
+    ("stuff; r?romulus", (["romulus"], [])),
+    ("stuff; r?#romulus", (["#romulus"], [])),
+    ("stuff; r?rom#ulus", (["rom"], [])),
+    ("stuff; r?romulus, r?remus", (["romulus", "remus"], [])),
+    ("stuff; r?romulus,r?remus", (["romulus", "remus"], [])),
+    ("stuff; r?romulus, remus", (["romulus", "remus"], [])),
+    ("stuff; r?romulus,remus", (["romulus", "remus"], [])),
+    ("stuff; (r?romulus)", (["romulus"], [])),
+    ("stuff; (r?romulus,remus)", (["romulus", "remus"], [])),
+    ("stuff; [r?romulus]", (["romulus"], [])),
+    (" stuff; [r?remus, r?romulus]", (["remus", "romulus"], [])),
+    ("stuff; r?romulus, a=test-only", (["romulus"], [])),
+    ("stuff; r?romulus, ux-r=test-only", (["romulus"], [])),
+    # now with r= mozphab granted syntax
+    ("stuff; r=romulus", ([], ["romulus"])),
+    ("stuff; r=#romulus", ([], ["#romulus"])),
+    ("stuff; r=rom#ulus", ([], ["rom"])),
+    ("stuff; r=romulus, r=remus", ([], ["romulus", "remus"])),
+    ("stuff; r=romulus,r=remus", ([], ["romulus", "remus"])),
+    ("stuff; r=romulus, remus", ([], ["romulus", "remus"])),
+    ("stuff; r=romulus,remus", ([], ["romulus", "remus"])),
+    ("stuff; (r=romulus)", ([], ["romulus"])),
+    ("stuff; (r=romulus,remus)", ([], ["romulus", "remus"])),
+    ("stuff; [r=romulus]", ([], ["romulus"])),
+    ("stuff; [r=remus, r=romulus]", ([], ["remus", "romulus"])),
+    ("stuff; r=romulus, a=test-only", ([], ["romulus"])),
+    ("stuff; r=romulus, a?test-only", ([], ["romulus"])),
+    ("stuff; r=romulus, ux-r=test-only", ([], ["romulus"])),
+    # mixed r? and r=
+    ("stuff; r?romulus r=remus", (["romulus"], ["remus"])),
+    ("stuff; r=romulus r?remus", (["remus"], ["romulus"])),
+    ("stuff; r?romulus,gps r=remus", (["romulus", "gps"], ["remus"])),
+    ("stuff; r?romulus r=remus,gps", (["romulus"], ["remus", "gps"])),
+    ("stuff; r?romulus r=remus r?next r=gps", (["romulus", "next"], ["remus", "gps"])),
+    ("stuff; r?romulus.r=remus", (["romulus.r"], ["remus"])),
+    (
+        "stuff; r?romulus r=romulus r?romulus! r=romulus!,romulus r?romulus",
+        (["romulus", "romulus!", "romulus"], ["romulus", "romulus!", "romulus"]),
+    ),
+    ("stuff; r=romulus r?remus,gps", (["remus", "gps"], ["romulus"])),
+    ("stuff; r=romulus,gps r?remus", (["remus"], ["romulus", "gps"])),
+    # try some other separators than ;
+    ("stuff r=romulus", ([], ["romulus"])),
+    ("stuff. r=romulus, r=remus", ([], ["romulus", "remus"])),
+    ("stuff - r=romulus,r=remus", ([], ["romulus", "remus"])),
+    ("stuff, r=romulus, remus", ([], ["romulus", "remus"])),
+    ("stuff.. r=romulus,remus", ([], ["romulus", "remus"])),
+    ("stuff | (r=romulus)", ([], ["romulus"])),
+    # make sure things work with different spacing
+    ("stuff;r=romulus,r=remus", ([], ["romulus", "remus"])),
+    ("stuff.r=romulus, r=remus", ([], ["romulus", "remus"])),
+    ("stuff,r=romulus, remus", ([], ["romulus", "remus"])),
+    ("stuff; r=gps DONTBUILD (NPOTB)", ([], ["gps"])),
+    ("stuff; r=gps DONTBUILD", ([], ["gps"])),
+    ("stuff; r=gps (DONTBUILD)", ([], ["gps"])),
+    # make sure things work with a period in the nickname
+    ("stuff;r=jimmy.james,r=bill.mcneal", ([], ["jimmy.james", "bill.mcneal"])),
+    # make sure period at the end does not get included
+    ("stuff;r=jimmy.", ([], ["jimmy"])),
+    # check some funky names too
+    ("stuff;r=a", ([], ["a"])),
+    ("stuff;r=aa", ([], ["aa"])),
+    ("stuff;r=.a", ([], [".a"])),
+    ("stuff;r=..a", ([], ["..a"])),
+    ("stuff;r=...a", ([], ["...a"])),
+    ("stuff;r=a...a", ([], ["a...a"])),
+    ("stuff;r=a.b", ([], ["a.b"])),
+    ("stuff;r=a.b.c", ([], ["a.b.c"])),
+    ("stuff;r=-.-.-", ([], ["-.-.-"])),
+    # altogether now with some spaces sprinkled here and there
+    (
+        "stuff;r=a,aa,.a,..a,...a, a...a,a.b, a.b.c, -.-.-",
+        (
+            [],
+            [
+                "a",
+                "aa",
+                ".a",
+                "..a",
+                "...a",
+                "a...a",
+                "a.b",
+                "a.b.c",
+                "-.-.-",
+            ],
+        ),
+    ),
+    # bare r?
+    ("stuff; r?", ([], [])),
+    ("stuff, r=", ([], [])),
+    # oddball real-world examples
+    (
+        "Bug 1094764 - Implement AudioContext.suspend and friends.  r=roc,ehsan",
+        ([], ["roc", "ehsan"]),
+    ),
+    (
+        "Bug 380783 - nsStringAPI.h: no equivalent of IsVoid (tell if "
+        "string is null), patch by Mook <mook.moz+mozbz@gmail.com>, "
+        "r=bsmedberg/dbaron, sr=dbaron, a1.9=bz",
+        ([], ["bsmedberg", "dbaron"]),
+    ),
+    (
+        "Bug 1181382: move declaration into namespace to resolve conflict. "
+        "r=hsinyi. try: -b d -p all -u none -t none",
+        ([], ["hsinyi"]),
+    ),
+    (
+        "Bug 1024110 - Change Aurora's default profile behavior to use "
+        "channel-specific profiles. r=bsmedberg f=gavin,markh",
+        ([], ["bsmedberg"]),
+    ),
+    (
+        "Bug 1199050 - Round off the corners of browser-extension-panel's "
+        "content. ui-r=maritz, r=gijs",
+        ([], ["gijs"]),
+    ),
+    (
+        "Bug 1197422 - Part 2: [webext] Implement the pageAction API. "
+        "r=billm ui-r=bwinton",
+        ([], ["billm"]),
+    ),
+]
+
+
+@pytest.mark.parametrize("title,expected", REVIEWER_CASES)
+def test_parse_reviewers(title, expected):
+    request, granted = expected
+    assert helpers.parse_reviewers(title) == {"request": request, "granted": granted}
+
+
 if __name__ == "__main__":
     unittest.main()
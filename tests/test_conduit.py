@@ -10,7 +10,7 @@ from unittest import mock
 import pytest
 from immutabledict import immutabledict
 
-from mozphab import exceptions, mozphab, repository, simplecache
+from mozphab import exceptions, mozphab, repository
 from mozphab.commits import Commit
 from mozphab.conduit import ConduitAPIError, conduit
 from mozphab.diff import Diff
@@ -138,11 +138,11 @@ def test_call(m_load_api_token, m_urlopen):
     m_urlopen.return_value = cm
 
     # success
-    cm.read.return_value = json.dumps({"result": "result", "error_code": False})
+    cm.read.return_value = b'{"result": "result", "error_code": false}'
     assert mozphab.conduit.call("method", {"call": "args"}) == "result"
 
     # error
-    cm.read.return_value = json.dumps({"error_info": "aieee", "error_code": 1})
+    cm.read.return_value = b'{"error_info": "aieee", "error_code": 1}'
     with pytest.raises(ConduitAPIError) as conduit_error:
         mozphab.conduit.call("method", {"call": "args"})
     assert conduit_error.value.args[0].startswith("Phabricator Error: ")
@@ -189,8 +189,7 @@ def get_revs():
 
 
 @pytest.fixture
-def m_call(request):
-    request.addfinalizer(simplecache.cache.reset)
+def m_call():
     with mock.patch("mozphab.conduit.ConduitAPI.call") as xmock:
         yield xmock
 
@@ -417,6 +416,19 @@ def test_get_related_phids(m_call):
     ]
     assert ["aaa"] == get_related_phids("ccc", include_abandoned=False)
 
+    # Self-referencing revision.
+    m_call.side_effect = [{"data": [{"destinationPHID": "aaa"}]}]
+    with pytest.raises(exceptions.NonLinearException):
+        get_related_phids("aaa", include_abandoned=True)
+
+    # Cycle of revisions.
+    m_call.side_effect = [
+        {"data": [{"destinationPHID": "bbb"}]},
+        {"data": [{"destinationPHID": "aaa"}]},
+    ]
+    with pytest.raises(exceptions.NonLinearException):
+        get_related_phids("aaa", include_abandoned=True)
+
 
 def test_has_revision_reviewers(m_call):
     commit = Commit(rev_id=None)
@@ -453,6 +465,7 @@ def test_save_api_token(m_chmod, m_get_arcrc_path, m_json, m_open, git):
     m_open.side_effect = (FileNotFoundError, with_open())
     save_api_token("abc")
     m_chmod.assert_called_once_with(".arcrc", 0o600)
+    assert conduit.load_api_token() == "abc"
 
     m_json.dump.assert_called_once_with(
         {"hosts": {git.api_url: {"token": "abc"}}}, mock.ANY, sort_keys=True, indent=2
@@ -491,6 +504,7 @@ def test_save_api_token(m_chmod, m_get_arcrc_path, m_json, m_open, git):
 def test_parse_git_diff():
     parse = Diff.parse_git_diff
     assert parse("@@ -40,9 +50,3 @@ packaging==19.1 \\") == (40, 50, 9, 3)
+    assert parse("@@ -1 +1 @@") == (1, 1, 1, 1)
 
 
 @mock.patch("mozphab.repository.conduit.call")
@@ -28,6 +28,8 @@ def test_defaults(config):
     assert config.always_full_stack is False
     assert config.create_commit is True
     assert config.self_last_check == 0
+    assert config.self_last_etag == ""
+    assert config.self_last_pypi_version == ""
     assert config.self_auto_update is True
     assert config.get_pre_releases is False
     assert config.report_to_sentry is True
@@ -101,3 +103,13 @@ def test_invalid_bool_field(config):
     assert (
         str(e.value) == "could not convert ui.no_ansi to a boolean: Not a boolean: test"
     )
+
+
+def test_write_etag_with_percent(config):
+    # Create the file, so the next write updates the `updater` section.
+    config.write()
+    config.self_last_etag = 'W/"ab%cd"'
+    config.write()
+
+    new_config = Config(filename=config.filename)
+    assert new_config.self_last_etag == 'W/"ab%cd"'
@@ -10,6 +10,9 @@ import pytest
 from mozphab import telemetry
 from mozphab.bmo import BMOAPIError
 
+# Resetting Glean is slow, only do it for the tests using it.
+pytestmark = pytest.mark.usefixtures("reset_glean")
+
 
 @pytest.fixture
 def get_telemetry():
@@ -3,7 +3,14 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
+import gzip
+import urllib.error
+from unittest import mock
+
+import pytest
+
 from mozphab import updater
+from mozphab.exceptions import Error
 
 
 def test_should_self_update():
@@ -60,3 +67,103 @@ def test_parse_latest_version_filename_case():
     assert (
         updater.parse_latest_prerelease_version(data) == "1.2.1"
     ), "`get_newest_pypi_version` should detect `1.2.1` as the latest version."
+
+
+@mock.patch("mozphab.updater.get_pypi_json")
+def test_check_for_updates_pypi_unreachable(m_get_pypi_json, monkeypatch, config):
+    monkeypatch.setattr(updater, "config", config)
+    m_get_pypi_json.side_effect = urllib.error.URLError("timed out")
+
+    assert (
+        updater.check_for_updates() is None
+    ), "An unreachable PyPI should not block the regular update check."
+
+    with pytest.raises(Error):
+        updater.check_for_updates(force_check=True)
+
+
+@mock.patch("mozphab.updater.get_pypi_json")
+def test_check_for_updates_etag(m_get_pypi_json, monkeypatch, config):
+    monkeypatch.setattr(updater, "config", config)
+    monkeypatch.setattr(updater, "MOZPHAB_VERSION", "1.0.0")
+    m_get_pypi_json.return_value = (
+        {"info": {"version": "1.1.0", "requires_python": ">=3.8"}},
+        '"etag-1"',
+    )
+
+    assert updater.check_for_updates(force_check=True) == "1.1.0"
+    m_get_pypi_json.assert_called_once_with(None)
+    assert config.self_last_etag == '"etag-1"', "`ETag` should be stored in config."
+    assert config.self_last_pypi_version == "1.1.0"
+
+    # PyPI responds with `304 Not Modified`.
+    m_get_pypi_json.reset_mock()
+    m_get_pypi_json.return_value = (None, '"etag-1"')
+    assert (
+        updater.check_for_updates(force_check=True) == "1.1.0"
+    ), "Unchanged PyPI data should use the version found in the last check."
+    m_get_pypi_json.assert_called_once_with('"etag-1"')
+
+
+def test_read_json_response():
+    body = b'{"info": {"version": "1.1.0"}}'
+    expected = {"info": {"version": "1.1.0"}}
+
+    response = mock.Mock()
+    response.read.return_value = body
+    response.headers = {}
+    assert updater.read_json_response(response) == expected
+
+    response.read.return_value = gzip.compress(body)
+    response.headers = {"Content-Encoding": "gzip"}
+    assert (
+        updater.read_json_response(response) == expected
+    ), "gzip encoded responses should be decompressed."
+
+
+@mock.patch("mozphab.updater.get_pypi_json")
+def test_check_for_updates_requires_python(m_get_pypi_json, monkeypatch, config):
+    monkeypatch.setattr(updater, "config", config)
+    monkeypatch.setattr(updater, "MOZPHAB_VERSION", "1.0.0")
+    monkeypatch.setattr(updater, "PYTHON_VERSION", "3.8.10")
+
+    m_get_pypi_json.return_value = (
+        {"info": {"version": "1.1.0", "requires_python": ">=3.8, <4"}},
+        None,
+    )
+    assert updater.check_for_updates(force_check=True) == "1.1.0"
+
+    m_get_pypi_json.return_value = (
+        {"info": {"version": "1.1.0", "requires_python": ">=3.9"}},
+        None,
+    )
+    with pytest.raises(Error):
+        updater.check_for_updates(force_check=True)
+
+    m_get_pypi_json.return_value = (
+        {"info": {"version": "1.1.0", "requires_python": None}},
+        None,
+    )
+    assert (
+        updater.check_for_updates(force_check=True) == "1.1.0"
+    ), "A missing `requires_python` should not block the update."
+
+
+@mock.patch("mozphab.updater.check_call")
+@mock.patch("mozphab.updater.get_user_scripts_dir")
+def test_self_upgrade_user_install(
+    m_get_user_scripts_dir, m_check_call, monkeypatch, config, tmp_path
+):
+    monkeypatch.setattr(updater, "config", config)
+    monkeypatch.setattr(updater.environment, "IS_WINDOWS", False)
+    monkeypatch.setattr(updater.sys, "argv", [str(tmp_path / "moz-phab")])
+
+    m_get_user_scripts_dir.return_value = str(tmp_path / "other")
+    updater.self_upgrade()
+    assert "--user" not in m_check_call.call_args[0][0]
+
+    m_get_user_scripts_dir.return_value = str(tmp_path)
+    updater.self_upgrade()
+    assert (
+        "--user" in m_check_call.call_args[0][0]
+    ), "Scripts installed in the user scripts directory should upgrade with `--user`."
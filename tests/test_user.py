@@ -3,8 +3,8 @@
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
 import hashlib
+import json
 import uuid
-from contextlib import contextmanager
 from unittest import mock
 
 import pytest
@@ -14,16 +14,13 @@ from mozphab.conduit import ConduitAPIError
 from mozphab.exceptions import Error
 
 
-@mock.patch("mozphab.user.USER_INFO_FILE")
-@mock.patch("mozphab.user.json")
-def test_save_user_info(m_json, m_file, user_data):
-    @contextmanager
-    def with_open(*_, **__):
-        yield None
+def test_save_user_info(monkeypatch, tmp_path, user_data):
+    user_info_dir = tmp_path / "moz-phab"
+    user_info_dir.mkdir()
+    user_info_file = user_info_dir / "user_info.json"
+    monkeypatch.setattr(user, "USER_INFO_FILE", user_info_file)
 
-    m_file.open = with_open
     # create file
-    m_file.exists.return_value = False
     installation_id = str(uuid.uuid4())
     user_info = {
         "is_employee": True,
@@ -32,25 +29,22 @@ def test_save_user_info(m_json, m_file, user_data):
         "last_check": 1,
     }
     user_data.save_user_info(**user_info)
-    m_json.dump.assert_called_once_with(user_info, None, sort_keys=True, indent=2)
+    assert user_info_file.read_bytes() == json.dumps(
+        user_info, sort_keys=True, indent=2
+    ).encode("utf-8"), "User info file format should be unchanged."
+    assert list(user_info_dir.iterdir()) == [
+        user_info_file
+    ], "Temporary file should be replaced by the user info file."
 
     # update file
-    m_file.exists.return_value = True
-    m_json.reset_mock()
-    m_json.load.return_value = user_info
     new_user_code = str(uuid.uuid4())
     user_data.save_user_info(user_code=new_user_code)
-    m_json.dump.assert_called_once_with(
-        {
-            "is_employee": True,
-            "user_code": new_user_code,
-            "installation_id": installation_id,
-            "last_check": 1,
-        },
-        None,
-        sort_keys=True,
-        indent=2,
-    )
+    assert json.loads(user_info_file.read_bytes()) == {
+        "is_employee": True,
+        "user_code": new_user_code,
+        "installation_id": installation_id,
+        "last_check": 1,
+    }
 
 
 def test_is_data_collected(user_data):
@@ -103,11 +97,10 @@ def test_is_data_collected(user_data):
 
 @mock.patch("mozphab.user.hashlib")
 @mock.patch("mozphab.user.UserData.whoami")
-@mock.patch("mozphab.user.UserData.save_user_info")
+@mock.patch("mozphab.user.UserData.write_user_info")
 @mock.patch("mozphab.user.USER_INFO_FILE")
 @mock.patch("mozphab.user.time")
-def test_set_user_data(m_time, m_file, m_save, m_whoami, m_hashlib, user_data):
-    m_save.return_value = False
+def test_set_user_data(m_time, m_file, m_write, m_whoami, m_hashlib, user_data):
     m_file.exists.return_value = True
     m_time.time.return_value = user.EMPLOYEE_CHECK_FREQUENCY - 1
     # all data saved in file, no need to update
@@ -159,11 +152,11 @@ def test_set_user_data(m_time, m_file, m_save, m_whoami, m_hashlib, user_data):
         "installation_id": "installation11111111111111111111",
         "last_check": 123,
     } == user_data.to_dict()
+    m_write.assert_called_once()
 
     # Create user_data file, employee
     m_file.exists.return_value = False
     m_whoami.side_effect = ({"email": "someemail", "is_employee": True},)
-    m_save.return_value = True
     user_data.installation_id = None
     assert user_data.set_user_data()
     user_data_dict = user_data.to_dict()